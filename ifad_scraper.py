@@ -6,6 +6,9 @@ Scrapes job listings from International Fund for Agricultural Development and ge
 
 import time
 import os
+import re
+import hashlib
+import socket
 from datetime import datetime, timezone
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -13,9 +16,72 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+import lxml.html
+from lxml import etree
+import requests
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from xml.sax.saxutils import escape
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# PeopleSoft grid ids end in $<row>; the row number keys the sibling field spans
+JOB_ID_RE = re.compile(r'HRS_APP_JBSCH_I_HRS_JOB_OPENING_ID\$(\d+)$')
+
+# Navigation/UI link text that Strategy 2 can pick up instead of job titles
+SKIP_RE = re.compile(r'\b(search|filter|login|sign in|home|about|all jobs)\b', re.IGNORECASE)
+
+# Strategy 2 lookups, compiled once instead of per job element
+JOB_LINKS_XPATH = etree.XPath("//a[contains(@id, 'SCH_JOB_TITLE$')]")
+LINK_XPATH = etree.XPath('.//a[@href]')
+ROW_LINK_XPATH = etree.XPath('ancestor::tr[1]//a[@href]')
+POSTING_TITLE_XPATH = etree.XPath(".//*[self::span or self::div][contains(@id, 'POSTING_TITLE')]")
+HEADING_XPATH = etree.XPath('.//*[self::h2 or self::h3 or self::h4 or self::a]')
+LOCATION_XPATH = etree.XPath(".//*[self::span or self::div][contains(@id, 'LOCATION')]")
+LOCATION_CLASS_XPATH = etree.XPath(
+    ".//*[self::span or self::div or self::p]"
+    "[contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'location')]"
+)
+ROW_LOCATION_XPATH = etree.XPath("ancestor::tr[1]//*[self::span or self::div][contains(@id, 'LOCATION')]")
+DEPARTMENT_XPATH = etree.XPath(".//*[self::span or self::div][contains(@id, 'DEPARTMENT')]")
+
+def get_chromedriver_path():
+    """Return an explicit chromedriver path, or None to let Selenium Manager resolve one"""
+    env_path = os.environ.get('IFAD_CHROMEDRIVER_PATH')
+    if env_path and os.path.isfile(env_path):
+        return env_path
+
+    # For GitHub Actions: use system Chrome
+    if os.path.isfile('/usr/bin/chromedriver'):
+        return '/usr/bin/chromedriver'
+
+    return None
+
+def clear_stale_profile_lock(profile_dir):
+    """Remove Chrome's profile locks left by a crashed run, keeping those of a live Chrome"""
+    # SingletonLock is a symlink to <hostname>-<pid> on Linux and macOS
+    if os.name != 'posix':
+        return
+    try:
+        host, _, pid = os.readlink(os.path.join(profile_dir, 'SingletonLock')).rpartition('-')
+    except OSError:
+        return
+    if host != socket.gethostname() or not pid.isdigit():
+        return
+
+    try:
+        os.kill(int(pid), 0)
+        return  # Owner is still running - let Chrome report the profile as in use
+    except ProcessLookupError:
+        pass
+    except PermissionError:
+        return  # Owner is running as another user
+
+    print(f"Removing stale Chrome profile lock left by process {pid}")
+    for lock_name in ('SingletonLock', 'SingletonSocket', 'SingletonCookie'):
+        lock_path = os.path.join(profile_dir, lock_name)
+        if os.path.lexists(lock_path):
+            os.remove(lock_path)
 
 def setup_driver():
     """Set up Chrome WebDriver with appropriate options"""
@@ -24,14 +90,47 @@ def setup_driver():
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-    
-    # For GitHub Actions: use system Chrome
-    service = Service('/usr/bin/chromedriver')
+    chrome_options.add_argument('--disable-software-rasterizer')
+    chrome_options.add_argument('--disable-accelerated-2d-canvas')
+    chrome_options.add_argument('--no-zygote')
+    # Keep the desktop width so PeopleSoft serves its full grid layout, but a
+    # short viewport - the lazy-load scroll brings in the rest of the rows
+    chrome_options.add_argument('--window-size=1920,400')
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+
+    # Opt-in persistent profile for local runs: cookies, cached scripts and
+    # HSTS state survive between runs. Only one driver can use it at a time.
+    profile_dir = os.environ.get('IFAD_CHROME_PROFILE')
+    if profile_dir:
+        profile_dir = os.path.expanduser(profile_dir)
+        os.makedirs(profile_dir, exist_ok=True)
+        clear_stale_profile_lock(profile_dir)
+        chrome_options.add_argument(f'--user-data-dir={profile_dir}')
+
+    # Skip images, stylesheets and fonts - only the DOM is scraped. JavaScript
+    # stays enabled because PeopleSoft renders the job grid client-side.
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-background-networking')
+    chrome_options.add_argument('--disable-sync')
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+
+    # Without an explicit path Selenium Manager matches the driver to the
+    # installed Chrome, so a Chrome auto-update never leaves a stale driver
+    driver_path = get_chromedriver_path()
+    service = Service(driver_path) if driver_path else Service()
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
 
+def first_match(element, xpath):
+    """Return the first element matched by a compiled XPath, or None"""
+    matches = xpath(element)
+    return matches[0] if matches else None
+
 def get_existing_job_links(feed_file='ifad_jobs.xml'):
     """Extract job links from existing RSS feed"""
     existing_links = set()
@@ -58,101 +157,117 @@ def get_existing_job_links(feed_file='ifad_jobs.xml'):
     
     return existing_links
 
-def scrape_ifad_jobs():
-    """Scrape job listings from IFAD"""
-    url = "https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/HRS_HRAM_FL.HRS_CG_SEARCH_FL.GBL?Page=HRS_APP_SCHJOB_FL&Action=U"
-
-    print(f"Starting scraper for: {url}")
-    driver = setup_driver()
+def listing_fingerprint(page_source):
+    """Hash every row of the job grid, or return None when the page has no job grid"""
+    if isinstance(page_source, str):
+        page_source = page_source.encode('utf-8')
+
+    # The job rows are the <li> items of the ps_grid-body list around the first
+    # job id; it holds no nested lists and none of the per-session ICSID state
+    first_job = page_source.find(b'HRS_APP_JBSCH_I_HRS_JOB_OPENING_ID$')
+    grid_class = page_source.rfind(b'ps_grid-body', 0, first_job) if first_job >= 0 else -1
+    start = page_source.rfind(b'<ul', 0, grid_class) if grid_class >= 0 else -1
+    end = page_source.find(b'</ul>', start) if start >= 0 else -1
+    if start < 0 or end < first_job:
+        return None
+    return hashlib.blake2b(page_source[start:end], digest_size=16).hexdigest()
+
+def read_last_hash(hash_file='.last_hash'):
+    """Return the listing fingerprint saved by the previous run, if any"""
+    if not os.path.exists(hash_file):
+        return None
+    with open(hash_file, 'r', encoding='utf-8') as f:
+        return f.read().strip() or None
+
+def write_last_hash(listing_hash, hash_file='.last_hash'):
+    """Save the listing fingerprint for the next run to compare against"""
+    with open(hash_file, 'w', encoding='utf-8') as f:
+        f.write(listing_hash + '\n')
+
+def text_of(element, default=''):
+    """Return an element's stripped text, or default when it is missing"""
+    return element.text_content().strip() if element is not None else default
+
+def build_description(title, location, department):
+    """Join title, location and department into a feed item description"""
+    description_parts = [title]
+    if location and location != "IFAD":
+        description_parts.append(f"Location: {location}")
+    if department:
+        description_parts.append(f"Department: {department}")
+    return " | ".join(description_parts)
+
+def parse_job_listings(page_source, max_jobs=50):
+    """Extract up to max_jobs job listings from the rendered PeopleSoft search page"""
+    tree = lxml.html.fromstring(page_source)
     jobs = []
 
-    try:
-        driver.get(url)
-        print("Page loaded, waiting for JavaScript to render...")
-
-        # Wait for PeopleSoft page to load
-        wait = WebDriverWait(driver, 30)
-        print("Waiting for job content to load...")
-        time.sleep(20)  # PeopleSoft can be slow to render
-
-        # Scroll to trigger any lazy loading
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(2)
-
-        # Get page source
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-
-        # Debug: Uncomment to save HTML for troubleshooting
-        # with open('debug_ifad.html', 'w', encoding='utf-8') as f:
-        #     f.write(page_source)
-        # print("Debug: Saved page HTML to debug_ifad.html")
-
-        # Try multiple strategies to find job listings
-        job_elements = []
-
-        # Strategy 1: Look for job ID elements (PeopleSoft pattern)
-        job_id_elements = soup.find_all('span', attrs={'id': lambda x: x and 'HRS_APP_JBSCH_I_HRS_JOB_OPENING_ID$' in str(x)})
-        if job_id_elements:
-            print(f"Strategy 1 (PeopleSoft job IDs): Found {len(job_id_elements)} jobs")
-            # Each job ID corresponds to a job - we'll extract full details
-            for idx, id_elem in enumerate(job_id_elements):
-                job_elements.append({'index': idx, 'id': id_elem.get_text(strip=True)})
-
-        # Strategy 2: Look for job links if Strategy 1 failed
-        if not job_elements:
-            job_links = soup.find_all('a', attrs={'id': lambda x: x and 'SCH_JOB_TITLE$' in str(x)})
-            if job_links:
-                print(f"Strategy 2 (job title links): Found {len(job_links)} jobs")
-                job_elements = job_links
-
-        print(f"Processing {len(job_elements)} potential job listings...")
-
-        for idx, element in enumerate(job_elements[:50]):  # Limit to first 50
-            try:
-                job_data = {}
-
-                # Handle dict elements from Strategy 1
-                if isinstance(element, dict):
-                    job_idx = element['index']
-                    job_data['job_id'] = element['id']
-
-                    # Find corresponding title (it's a span, not a link)
-                    title_elem = soup.find('span', attrs={'id': f'SCH_JOB_TITLE${job_idx}'})
-                    if not title_elem or not title_elem.get_text(strip=True):
-                        continue
-
-                    job_data['title'] = title_elem.get_text(strip=True)
+    # Index id-bearing spans once so per-row field lookups are O(1)
+    by_id = {el.get('id'): el for el in tree.iter('span') if el.get('id')}
+
+    # Strategy 1: Look for job ID elements (PeopleSoft pattern)
+    job_id_matches = [match for match in map(JOB_ID_RE.match, by_id) if match]
+    if job_id_matches:
+        print(f"Strategy 1 (PeopleSoft job IDs): Found {len(job_id_matches)} jobs")
+        print(f"Processing {len(job_id_matches)} potential job listings...")
+
+        # Cap before extracting; PeopleSoft suffixes every field in a grid row
+        # with the same $<row>, so each field is a direct index lookup
+        try:
+            rows = [
+                (
+                    text_of(by_id[match.string]),
+                    text_of(by_id.get(f'SCH_JOB_TITLE${match.group(1)}')),
+                    text_of(by_id.get(f'LOCATION${match.group(1)}'), "IFAD"),
+                    text_of(by_id.get(f'HRS_APP_JBSCH_I_HRS_DEPT_DESCR${match.group(1)}')),
+                )
+                for match in job_id_matches[:max_jobs]
+            ]
+            jobs = [
+                {
+                    'job_id': job_id,
+                    'title': title,
                     # Build job detail URL using job ID
-                    job_data['link'] = f"https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/HRS_HRAM_FL.HRS_CG_SEARCH_FL.GBL?Page=HRS_APP_JBPST&Action=U&FOCUS=Applicant&SiteId=1&JobOpeningId={job_data['job_id']}"
-
-                    # Find location
-                    location_elem = soup.find('span', attrs={'id': f'LOCATION${job_idx}'})
-                    job_data['location'] = location_elem.get_text(strip=True) if location_elem else "IFAD"
-
-                    # Find department
-                    dept_elem = soup.find('span', attrs={'id': f'HRS_APP_JBSCH_I_HRS_DEPT_DESCR${job_idx}'})
-                    job_data['department'] = dept_elem.get_text(strip=True) if dept_elem else ""
-
-                    # Create description
-                    description_parts = [job_data['title']]
-                    if job_data.get('location') and job_data['location'] != "IFAD":
-                        description_parts.append(f"Location: {job_data['location']}")
-                    if job_data.get('department'):
-                        description_parts.append(f"Department: {job_data['department']}")
-                    job_data['description'] = " | ".join(description_parts)
-
-                    # Add job and continue to next
-                    if job_data.get('title') and job_data.get('link'):
-                        jobs.append(job_data)
-                        print(f"  [OK] {job_data['title']}")
-                    continue
-
-                # Handle link elements from Strategy 2
-                if hasattr(element, 'name') and element.name == 'a' and element.get('href'):
-                    href = element['href']
+                    'link': f"https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/HRS_HRAM_FL.HRS_CG_SEARCH_FL.GBL?Page=HRS_APP_JBPST&Action=U&FOCUS=Applicant&SiteId=1&JobOpeningId={job_id}",
+                    'location': location,
+                    'department': department,
+                    'description': build_description(title, location, department),
+                }
+                for job_id, title, location, department in rows
+                if title
+            ]
+        except Exception as e:
+            print(f"  [ERROR] Error processing job rows: {str(e)}")
+            jobs = []
+
+        for job_data in jobs:
+            print(f"  [OK] {job_data['title']}")
+        return jobs
+
+    # Strategy 2: Look for job links if Strategy 1 failed
+    job_elements = JOB_LINKS_XPATH(tree)
+    if job_elements:
+        print(f"Strategy 2 (job title links): Found {len(job_elements)} jobs")
+
+    print(f"Processing {len(job_elements)} potential job listings...")
+
+    for element in job_elements[:max_jobs]:
+        try:
+            job_data = {}
+
+            # Handle link elements from Strategy 2
+            if element.tag == 'a' and element.get('href'):
+                href = element.get('href')
+                if href.startswith('http'):
+                    job_data['link'] = href
+                elif href.startswith('/'):
+                    job_data['link'] = f"https://job.ifad.org{href}"
+                else:
+                    job_data['link'] = f"https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/{href}"
+            else:
+                link_elem = first_match(element, LINK_XPATH)
+                if link_elem is not None:
+                    href = link_elem.get('href')
                     if href.startswith('http'):
                         job_data['link'] = href
                     elif href.startswith('/'):
@@ -160,163 +275,193 @@ def scrape_ifad_jobs():
                     else:
                         job_data['link'] = f"https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/{href}"
                 else:
-                    link_elem = element.find('a', href=True)
-                    if link_elem:
-                        href = link_elem['href']
+                    # Try to find parent row and get link from there
+                    link_elem = first_match(element, ROW_LINK_XPATH)
+                    if link_elem is not None:
+                        href = link_elem.get('href')
                         if href.startswith('http'):
                             job_data['link'] = href
-                        elif href.startswith('/'):
-                            job_data['link'] = f"https://job.ifad.org{href}"
                         else:
-                            job_data['link'] = f"https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/{href}"
-                    else:
-                        # Try to find parent row and get link from there
-                        parent = element.find_parent('tr')
-                        if parent:
-                            link_elem = parent.find('a', href=True)
-                            if link_elem:
-                                href = link_elem['href']
-                                if href.startswith('http'):
-                                    job_data['link'] = href
-                                else:
-                                    job_data['link'] = f"https://job.ifad.org{href}"
-
-                        if not job_data.get('link'):
-                            continue
-
-                # Get job title
-                if element.name == 'a':
-                    job_data['title'] = element.get_text(strip=True)
+                            job_data['link'] = f"https://job.ifad.org{href}"
+
+                    if not job_data.get('link'):
+                        continue
+
+            # Get job title
+            if element.tag == 'a':
+                job_data['title'] = element.text_content().strip()
+            else:
+                # Look for title in span or div
+                title_elem = first_match(element, POSTING_TITLE_XPATH)
+                if title_elem is None:
+                    title_elem = first_match(element, HEADING_XPATH)
+
+                if title_elem is not None:
+                    job_data['title'] = title_elem.text_content().strip()
                 else:
-                    # Look for title in span or div
-                    title_elem = element.find(['span', 'div'], attrs={'id': lambda x: x and 'POSTING_TITLE' in str(x)})
-                    if not title_elem:
-                        title_elem = element.find(['h2', 'h3', 'h4', 'a'])
+                    job_data['title'] = element.text_content().strip()[:100]
 
-                    if title_elem:
-                        job_data['title'] = title_elem.get_text(strip=True)
-                    else:
-                        job_data['title'] = element.get_text(strip=True)[:100]
-
-                # Skip if title is too short or generic
-                if not job_data.get('title') or len(job_data['title']) < 5:
-                    continue
-
-                skip_keywords = ['search', 'filter', 'login', 'sign in', 'home', 'about', 'all jobs']
-                if any(keyword in job_data['title'].lower() for keyword in skip_keywords):
-                    continue
-
-                # Get location
-                location_elem = element.find(['span', 'div'], attrs={'id': lambda x: x and 'LOCATION' in str(x)})
-                if not location_elem:
-                    location_elem = element.find(['span', 'div', 'p'], class_=lambda x: x and 'location' in str(x).lower())
-                if not location_elem and element.name != 'a':
-                    parent = element.find_parent('tr')
-                    if parent:
-                        location_elem = parent.find(['span', 'div'], attrs={'id': lambda x: x and 'LOCATION' in str(x)})
-
-                job_data['location'] = location_elem.get_text(strip=True) if location_elem else "IFAD"
-
-                # Get department/unit
-                dept_elem = element.find(['span', 'div'], attrs={'id': lambda x: x and 'DEPARTMENT' in str(x)})
-                job_data['department'] = dept_elem.get_text(strip=True) if dept_elem else ""
-
-                # Create description
-                description_parts = [job_data['title']]
-                if job_data.get('location') and job_data['location'] != "IFAD":
-                    description_parts.append(f"Location: {job_data['location']}")
-                if job_data.get('department'):
-                    description_parts.append(f"Department: {job_data['department']}")
-
-                job_data['description'] = " | ".join(description_parts)
-
-                if job_data['title'] and job_data['link']:
-                    jobs.append(job_data)
-                    print(f"  [OK] {job_data['title']}")
-
-            except Exception as e:
-                print(f"  [ERROR] Error processing element: {str(e)}")
+            # Skip if title is too short or generic
+            if not job_data.get('title') or len(job_data['title']) < 5:
                 continue
 
-        print(f"\nSuccessfully scraped {len(jobs)} jobs")
+            if SKIP_RE.search(job_data['title']):
+                continue
 
-    except Exception as e:
-        print(f"Error during scraping: {str(e)}")
+            # Get location
+            location_elem = first_match(element, LOCATION_XPATH)
+            if location_elem is None:
+                location_elem = first_match(element, LOCATION_CLASS_XPATH)
+            if location_elem is None and element.tag != 'a':
+                location_elem = first_match(element, ROW_LOCATION_XPATH)
 
-    finally:
-        driver.quit()
+            job_data['location'] = text_of(location_elem, "IFAD")
 
-    return jobs
+            # Get department/unit
+            job_data['department'] = text_of(first_match(element, DEPARTMENT_XPATH))
 
-def generate_rss_feed(jobs, output_file='ifad_jobs.xml'):
-    """Generate RSS 2.0 feed from job listings"""
+            job_data['description'] = build_description(job_data['title'], job_data['location'], job_data['department'])
 
-    # Register atom namespace
-    ET.register_namespace('atom', 'http://www.w3.org/2005/Atom')
+            if job_data['title'] and job_data['link']:
+                jobs.append(job_data)
+                print(f"  [OK] {job_data['title']}")
 
-    # Create RSS root element
-    rss = ET.Element('rss', version='2.0')
+        except Exception as e:
+            print(f"  [ERROR] Error processing element: {str(e)}")
+            continue
 
-    # Create channel element
-    channel = ET.SubElement(rss, 'channel')
+    return jobs
 
-    # Add channel metadata
-    title = ET.SubElement(channel, 'title')
-    title.text = 'IFAD Jobs - New Postings'
+def fetch_listing_page(url):
+    """Fetch the job search page over plain HTTP as raw bytes, returning None on failure"""
+    try:
+        with requests.Session() as session:
+            session.headers['User-Agent'] = USER_AGENT
+            # Kept short - a miss only delays the Selenium fallback
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            # Bytes let lxml honour the page's own encoding declaration
+            return response.content
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed: {str(e)}")
+        return None
+
+def parse_if_changed(page_source, previous_hash):
+    """Return (jobs, listing_hash), with jobs None when the listing matches previous_hash"""
+    listing_hash = listing_fingerprint(page_source)
+    if listing_hash is not None and listing_hash == previous_hash:
+        return None, listing_hash
+    return parse_job_listings(page_source), listing_hash
+
+def scrape_ifad_jobs(previous_hash=None):
+    """Scrape job listings from IFAD, returning (jobs, listing_hash)"""
+    url = "https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/HRS_HRAM_FL.HRS_CG_SEARCH_FL.GBL?Page=HRS_APP_SCHJOB_FL&Action=U"
 
-    link = ET.SubElement(channel, 'link')
-    link.text = 'https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/HRS_HRAM_FL.HRS_CG_SEARCH_FL.GBL?Page=HRS_APP_SCHJOB_FL&Action=U'
+    print(f"Starting scraper for: {url}")
 
-    description = ET.SubElement(channel, 'description')
-    description.text = 'New job listings from International Fund for Agricultural Development (IFAD)'
+    # Unverified fast path: if a plain GET already carries the job grid, no
+    # browser is needed. debug_ifad.html is a Selenium page_source dump, so it
+    # does not show what the raw response contains; anything else falls back
+    # to Selenium.
+    page_source = fetch_listing_page(url)
+    if page_source:
+        try:
+            jobs, listing_hash = parse_if_changed(page_source, previous_hash)
+            if jobs is None:
+                print("Job listing unchanged since last run, skipping parse")
+                return jobs, listing_hash
+            if jobs:
+                print(f"\nSuccessfully scraped {len(jobs)} jobs over HTTP")
+                return jobs, listing_hash
+            print("No job listings in HTTP response, falling back to Selenium")
+        except Exception as e:
+            print(f"Error parsing HTTP response: {str(e)}, falling back to Selenium")
 
-    language = ET.SubElement(channel, 'language')
-    language.text = 'en-us'
+    driver = setup_driver()
+    jobs = []
+    listing_hash = None
 
-    # Add atom:link for self-reference
-    atom_link = ET.SubElement(channel, '{http://www.w3.org/2005/Atom}link')
-    atom_link.set('href', 'https://cinfoposte.github.io/-ifad-jobs/ifad_jobs.xml')
-    atom_link.set('rel', 'self')
-    atom_link.set('type', 'application/rss+xml')
+    try:
+        driver.get(url)
+        print("Page loaded, waiting for JavaScript to render...")
 
-    # Add lastBuildDate
-    last_build = ET.SubElement(channel, 'lastBuildDate')
-    current_time = datetime.now(timezone.utc)
-    last_build.text = current_time.strftime('%a, %d %b %Y %H:%M:%S +0000')
+        # Wait for PeopleSoft to render the job grid rather than sleeping a fixed time
+        wait = WebDriverWait(driver, 30)
+        print("Waiting for job content to load...")
+        try:
+            wait.until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "span[id^='HRS_APP_JBSCH_I_HRS_JOB_OPENING_ID$']")))
+
+            # Scroll to trigger any lazy loading
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            wait.until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "span[id^='SCH_JOB_TITLE$']")))
+            driver.execute_script("window.scrollTo(0, 0);")
+            time.sleep(0.5)  # Let PeopleSoft finish its grid animation
+        except TimeoutException:
+            # Fall through and let the other strategies inspect whatever rendered
+            print("Timed out waiting for PeopleSoft job IDs, parsing page as-is")
 
-    # Add job items
-    for job in jobs:
-        item = ET.SubElement(channel, 'item')
+        # Get page source
+        page_source = driver.page_source
 
-        item_title = ET.SubElement(item, 'title')
-        item_title.text = job.get('title', 'Untitled Position')
+        # Debug: Uncomment to save HTML for troubleshooting
+        # with open('debug_ifad.html', 'w', encoding='utf-8') as f:
+        #     f.write(page_source)
+        # print("Debug: Saved page HTML to debug_ifad.html")
 
-        item_link = ET.SubElement(item, 'link')
-        item_link.text = job.get('link', '')
+        jobs, listing_hash = parse_if_changed(page_source, previous_hash)
+        if jobs is None:
+            print("Job listing unchanged since last run, skipping parse")
+        else:
+            print(f"\nSuccessfully scraped {len(jobs)} jobs")
 
-        item_description = ET.SubElement(item, 'description')
-        item_description.text = job.get('description', '')
+    except Exception as e:
+        print(f"Error during scraping: {str(e)}")
 
-        # Add publication date (when the job was found)
-        pub_date = ET.SubElement(item, 'pubDate')
-        pub_date.text = current_time.strftime('%a, %d %b %Y %H:%M:%S +0000')
+    finally:
+        driver.quit()
 
-        # Add GUID
-        guid = ET.SubElement(item, 'guid')
-        guid.set('isPermaLink', 'true')
-        guid.text = job.get('link', '')
+    return jobs, listing_hash
 
-    # Create pretty-printed XML
-    xml_string = ET.tostring(rss, encoding='unicode')
-    dom = minidom.parseString(xml_string)
-    pretty_xml = dom.toprettyxml(indent='  ')
+def generate_rss_feed(jobs, output_file='ifad_jobs.xml'):
+    """Generate RSS 2.0 feed from job listings"""
 
-    # Remove extra blank lines
-    pretty_xml = '\n'.join([line for line in pretty_xml.split('\n') if line.strip()])
+    current_time = datetime.now(timezone.utc)
+    build_date = current_time.strftime('%a, %d %b %Y %H:%M:%S +0000')
+
+    # Channel metadata, written as text rather than built as a tree
+    header = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss xmlns:atom="http://www.w3.org/2005/Atom" version="2.0">\n'
+        '  <channel>\n'
+        '    <title>IFAD Jobs - New Postings</title>\n'
+        '    <link>https://job.ifad.org/psc/IFHRPRDE/CAREERS/JOBS/c/HRS_HRAM_FL.HRS_CG_SEARCH_FL.GBL?Page=HRS_APP_SCHJOB_FL&amp;Action=U</link>\n'
+        '    <description>New job listings from International Fund for Agricultural Development (IFAD)</description>\n'
+        '    <language>en-us</language>\n'
+        '    <atom:link href="https://cinfoposte.github.io/-ifad-jobs/ifad_jobs.xml" rel="self" type="application/rss+xml"/>\n'
+        f'    <lastBuildDate>{build_date}</lastBuildDate>\n'
+    )
+
+    # Add job items - pubDate is when the job was found
+    items = []
+    for job in jobs:
+        link = escape(job.get('link', ''))
+        items.append(
+            '    <item>\n'
+            f"      <title>{escape(job.get('title', 'Untitled Position'))}</title>\n"
+            f'      <link>{link}</link>\n'
+            f"      <description>{escape(job.get('description', ''))}</description>\n"
+            f'      <pubDate>{build_date}</pubDate>\n'
+            f'      <guid isPermaLink="true">{link}</guid>\n'
+            '    </item>\n'
+        )
+
+    footer = '  </channel>\n</rss>\n'
 
     # Write to file
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(pretty_xml)
+        f.write(header + ''.join(items) + footer)
 
     print(f"\n[SUCCESS] RSS feed generated: {output_file}")
     print(f"  Total jobs in feed: {len(jobs)}")
@@ -330,8 +475,16 @@ def main():
     # Get existing job links from previous feed
     existing_links = get_existing_job_links()
 
-    # Scrape jobs
-    all_jobs = scrape_ifad_jobs()
+    # Only compare against the last listing if the feed built from it still exists
+    previous_hash = read_last_hash() if os.path.exists('ifad_jobs.xml') else None
+
+    # Scrape jobs (Chrome is only started if the HTTP fast path finds nothing)
+    all_jobs, listing_hash = scrape_ifad_jobs(previous_hash=previous_hash)
+
+    if all_jobs is None:
+        print("\n[INFO] Job listing unchanged since last run - feed not updated")
+        print("=" * 60)
+        return
 
     # Filter to only new jobs
     new_jobs = [job for job in all_jobs if job.get('link') not in existing_links]
@@ -359,6 +512,10 @@ def main():
             print("[INFO] Creating empty feed file")
             generate_rss_feed([])
 
+    # Remember this listing so an identical one next run skips all parsing
+    if all_jobs and listing_hash:
+        write_last_hash(listing_hash)
+
     print("=" * 60)
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+import os
+import re
+import unittest
+
+import ifad_scraper
+
+DEBUG_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'debug_ifad.html')
+
+class ListingFingerprintTest(unittest.TestCase):
+    """The fingerprint must change whenever any field of any grid row changes"""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(DEBUG_PAGE, encoding='utf-8') as f:
+            cls.page = f.read()
+        cls.fingerprint = ifad_scraper.listing_fingerprint(cls.page)
+
+    def field_text(self, field_id):
+        """Return the text of the span with the given id in the saved page"""
+        start = self.page.index('>', self.page.index(f'id="{field_id}"')) + 1
+        return self.page[start:self.page.index('<', start)]
+
+    def with_field_changed(self, field_id):
+        """Return the saved page with one span's text altered"""
+        start = self.page.index('>', self.page.index(f'id="{field_id}"')) + 1
+        end = self.page.index('<', start)
+        return self.page[:start] + self.page[start:end] + ' (Re-advertised)' + self.page[end:]
+
+    def test_grid_page_has_fingerprint(self):
+        self.assertIsNotNone(self.fingerprint)
+
+    def test_page_without_grid_has_no_fingerprint(self):
+        self.assertIsNone(ifad_scraper.listing_fingerprint('<html><input name="ICSID" value="x"></html>'))
+
+    def test_bytes_and_str_agree(self):
+        self.assertEqual(ifad_scraper.listing_fingerprint(self.page.encode('utf-8')), self.fingerprint)
+
+    def test_first_and_last_row_fields_change_fingerprint(self):
+        rows = [int(row) for row in re.findall(r'id="HRS_APP_JBSCH_I_HRS_JOB_OPENING_ID\$(\d+)"', self.page)]
+        fields = ['HRS_APP_JBSCH_I_HRS_JOB_OPENING_ID', 'SCH_JOB_TITLE', 'LOCATION',
+                  'HRS_APP_JBSCH_I_HRS_DEPT_DESCR', 'SCH_OPENED']
+        for row in (min(rows), max(rows)):
+            for field in fields:
+                field_id = f'{field}${row}'
+                with self.subTest(field_id=field_id):
+                    self.assertTrue(self.field_text(field_id).strip())
+                    changed = self.with_field_changed(field_id)
+                    self.assertNotEqual(ifad_scraper.listing_fingerprint(changed), self.fingerprint)
+                    jobs, _ = ifad_scraper.parse_if_changed(changed, self.fingerprint)
+                    self.assertIsNotNone(jobs)
+
+    def test_closing_date_changes_fingerprint(self):
+        changed = self.with_field_changed('HRS_JO_PST_CLS_DT$0')
+        self.assertNotEqual(ifad_scraper.listing_fingerprint(changed), self.fingerprint)
+
+if __name__ == '__main__':
+    unittest.main()